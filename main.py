@@ -1,19 +1,342 @@
 import os
+import queue
+import hashlib
+import functools
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from pymongo import MongoClient
+import bson
+from bson.raw_bson import RawBSONDocument
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import pyarrow.parquet as pq
+from pymongo import IndexModel, InsertOne, MongoClient
 from pymongo.errors import ConnectionFailure, BulkWriteError
 import logging
-from typing import List, Optional
-from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
 import argparse
 
 # Настройка логирования
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
+    format=LOG_FORMAT
 )
 logger = logging.getLogger(__name__)
 
+# Размер батча для вставки по умолчанию; PyMongo сам делит батч по лимитам
+# сообщения сервера (maxWriteBatchSize / maxMessageSizeBytes)
+DEFAULT_BATCH_SIZE = 10000
+# Количество потоков, параллельно отправляющих батчи в MongoDB
+INSERT_WORKERS = 32
+# Максимальное количество батчей, ожидающих вставки
+MAX_IN_FLIGHT_BATCHES = 64
+# Прогресс вставки логируется каждые N батчей или каждые N секунд
+PROGRESS_LOG_BATCHES = 100
+PROGRESS_LOG_INTERVAL = 5.0
+
+# Столбцы, читаемые из CSV
+CSV_COLUMNS = ['Open time', 'Open', 'Close', 'High', 'Low', 'Volume']
+# Типы столбцов при чтении CSV: числа разбирает pyarrow (Open time - метка времени в секундах / миллисекундах)
+CSV_COLUMN_TYPES = {
+    'Open time': pa.int64(),
+    **{field: pa.float64() for field in ['Open', 'Close', 'High', 'Low', 'Volume']}
+}
+# pyarrow не умеет заменять отдельные некорректные ячейки: файл с ошибкой преобразования
+# дочитывается строками, приведение типов с заменой ошибок на None выполняется в prepare_data_for_mongodb
+CSV_STRING_TYPES = {field: pa.string() for field in CSV_COLUMNS}
+
+# Диапазон числовых меток времени в миллисекундах, представимых в datetime (годы 1..9999)
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+EPOCH_MS_MIN = (datetime.min.replace(tzinfo=timezone.utc) - _EPOCH) // timedelta(milliseconds=1)
+EPOCH_MS_MAX = (datetime.max.replace(tzinfo=timezone.utc) - _EPOCH) // timedelta(milliseconds=1)
+
+# Размер буфера чтения CSV файлов, байт
+READ_BUFFER_SIZE = 1 << 20
+
+# Схема подготовленных данных (результат CSVToMongoDBLoader.convert_columns), хранимых в кэше
+PREPARED_SCHEMA = pa.schema([
+    (field, pa.string() if field == 'Open time' else pa.float64()) for field in CSV_COLUMNS
+])
+# Версия формата кэша: увеличивается при изменении преобразования столбцов (convert_columns и helpers),
+# чтобы не использовать данные, подготовленные прежней логикой
+CACHE_VERSION = 1
+# Максимальный размер кэша подготовленных CSV (Parquet), байт
+CACHE_MAX_BYTES = 10 * 1024 ** 3
+# Возраст, после которого временный файл кэша считается брошенным (если владельца проверить нельзя), секунд
+CACHE_TMP_MAX_AGE = 24 * 3600
+
+# Очередь частей CSV для процессов-воркеров (задается инициализатором пула)
+_chunk_queue = None
+
+
+def _init_worker(chunk_queue):
+    """Инициализация процесса-воркера чтения CSV"""
+    global _chunk_queue
+    _chunk_queue = chunk_queue
+    # Очередь логирования родительского процесса в воркере не обслуживается - пишем напрямую
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT, force=True)
+
+
+def _open_sequential(path: str) -> BinaryIO:
+    """Открытие файла для последовательного чтения: большой буфер и упреждающее чтение ядром"""
+    fh = open(path, 'rb', buffering=READ_BUFFER_SIZE)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fh.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            # Подсказка необязательна: файловая система может ее не поддерживать
+            pass
+    return fh
+
+
+def _open_csv(source: BinaryIO, column_types: dict) -> pacsv.CSVStreamingReader:
+    """Потоковое чтение CSV через pyarrow с заданными типами столбцов (без вывода типов по первому блоку)"""
+    return pacsv.open_csv(
+        source,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=CSV_COLUMNS,
+            column_types=column_types
+        )
+    )
+
+
+def _read_csv(csv_file: str) -> Iterator[pa.RecordBatch]:
+    """Чтение блоков CSV с типизированными столбцами; при ошибке преобразования значения
+    файл дочитывается строками (уже прочитанные строки пропускаются)
+    """
+    rows = 0
+    try:
+        with _open_sequential(csv_file) as fh:
+            for record_batch in _open_csv(fh, CSV_COLUMN_TYPES):
+                rows += record_batch.num_rows
+                yield record_batch
+        return
+    except pa.ArrowInvalid as e:
+        # Прочие ошибки разбора (например, неверное число столбцов) строками не исправить
+        if 'conversion error' not in str(e):
+            raise
+        logger.info(f"Файл {csv_file} дочитывается строками: {e}")
+    
+    with _open_sequential(csv_file) as fh:
+        for record_batch in _open_csv(fh, CSV_STRING_TYPES):
+            skip = min(rows, record_batch.num_rows)
+            rows -= skip
+            if skip < record_batch.num_rows:
+                yield record_batch.slice(skip)
+
+
+def _cache_path(csv_file: str, cache_dir: str) -> str:
+    """Путь к Parquet кэшу файла; ключ меняется при изменении файла, типов столбцов чтения,
+    логики преобразования (CACHE_VERSION, схема результата, версия pandas)
+    """
+    stat = os.stat(csv_file)
+    schema = ','.join(f"{field}={CSV_COLUMN_TYPES[field]}" for field in CSV_COLUMNS)
+    prepared = ','.join(f"{field.name}={field.type}" for field in PREPARED_SCHEMA)
+    key = (f"{os.path.abspath(csv_file)}:{stat.st_mtime_ns}:{stat.st_size}:{schema}:"
+           f"{prepared}:{CACHE_VERSION}:{pd.__version__}")
+    return os.path.join(cache_dir, f"{hashlib.sha256(key.encode()).hexdigest()}.parquet")
+
+
+def _iter_prepared_chunks(csv_file: str, chunksize: int, cache_dir: Optional[str]) -> Iterator[pd.DataFrame]:
+    """Части файла по chunksize строк с преобразованными столбцами: из Parquet кэша, если он есть,
+    иначе чтение CSV и преобразование с записью результата в кэш
+    """
+    if cache_dir is None:
+        for table in _rebatch(_read_csv(csv_file), chunksize):
+            yield CSVToMongoDBLoader.convert_columns(table.to_pandas())
+        return
+    
+    cache_file = _cache_path(csv_file, cache_dir)
+    if os.path.exists(cache_file):
+        # Обновляем время изменения для вытеснения по LRU
+        os.utime(cache_file)
+        # Разбор и преобразование пропускаются: в кэше уже ISO даты и float64 значения
+        for table in _rebatch(pq.ParquetFile(cache_file).iter_batches(batch_size=chunksize), chunksize):
+            yield table.to_pandas()
+        return
+    
+    # Кэш пишется во временный файл и появляется только после полного чтения CSV
+    tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+    try:
+        with pq.ParquetWriter(tmp_file, PREPARED_SCHEMA) as writer:
+            for table in _rebatch(_read_csv(csv_file), chunksize):
+                chunk = CSVToMongoDBLoader.convert_columns(table.to_pandas())
+                writer.write_table(pa.Table.from_pandas(chunk, schema=PREPARED_SCHEMA, preserve_index=False))
+                yield chunk
+        os.replace(tmp_file, cache_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _rebatch(record_batches: Iterator[pa.RecordBatch], chunksize: int) -> Iterator[pa.Table]:
+    """Перенарезка блоков pyarrow (ограничены размером в байтах) на батчи ровно по chunksize строк;
+    последний батч файла содержит остаток
+    """
+    buffered = []
+    rows = 0
+    for record_batch in record_batches:
+        if buffered and not record_batch.schema.equals(buffered[0].schema):
+            # Файл дочитывается строками: набранная часть батча тоже приводится к строкам
+            buffered = pa.Table.from_batches(buffered).cast(record_batch.schema).to_batches()
+        offset = 0
+        while offset < record_batch.num_rows:
+            take = min(chunksize - rows, record_batch.num_rows - offset)
+            buffered.append(record_batch.slice(offset, take))
+            rows += take
+            offset += take
+            if rows == chunksize:
+                yield pa.Table.from_batches(buffered)
+                buffered, rows = [], 0
+    if rows:
+        yield pa.Table.from_batches(buffered)
+
+
+def _is_stale_tmp(name: str, stat: os.stat_result) -> bool:
+    """Временный файл кэша брошен: процесс-владелец (pid в имени файла) завершен,
+    а где проверить процесс нельзя - файл давно не изменялся
+    """
+    if os.name == 'posix':
+        try:
+            os.kill(int(name.rsplit('.', 2)[-2]), 0)
+            return False
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            # Процесс существует, но принадлежит другому пользователю
+            return False
+        except ValueError:
+            pass
+    return time.time() - stat.st_mtime > CACHE_TMP_MAX_AGE
+
+
+def _purge_cache(cache_dir: str, max_bytes: int = CACHE_MAX_BYTES) -> None:
+    """Удаление давно не использованных файлов кэша сверх max_bytes (LRU по времени изменения)
+    и временных файлов, брошенных аварийно завершенными воркерами
+    """
+    try:
+        cache_files = []
+        with os.scandir(cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.parquet'):
+                    cache_files.append((entry.stat(), entry.path))
+                elif entry.name.endswith('.tmp') and _is_stale_tmp(entry.name, entry.stat()):
+                    os.remove(entry.path)
+        cache_files.sort(key=lambda item: item[0].st_mtime, reverse=True)
+        total = 0
+        for stat, path in cache_files:
+            total += stat.st_size
+            if total > max_bytes:
+                os.remove(path)
+    except Exception as e:
+        logger.warning(f"Ошибка при очистке кэша {cache_dir}: {e}")
+
+
+def _parse_one(file_name: str, csv_file: str, chunksize: int, import_timestamp: datetime,
+               cache_dir: Optional[str] = None) -> None:
+    """Чтение одного CSV файла частями в процессе-воркере.
+    Части подготавливаются, кодируются в BSON и отправляются в очередь списками документов,
+    по окончании файла отправляется None.
+    """
+    rows = 0
+    # Общие поля файла добавляются в документы при подготовке, а не столбцами
+    common = {
+        'source_file': file_name,
+        'import_timestamp': import_timestamp
+    }
+    try:
+        for chunk in _iter_prepared_chunks(csv_file, chunksize, cache_dir):
+            rows += len(chunk)
+            # Кодирование в BSON здесь, параллельно в воркерах, а не в потоках вставки
+            docs = [
+                bson.encode(doc)
+                for doc in CSVToMongoDBLoader.iter_documents(chunk, common)
+            ]
+            # Пустые батчи (например, из одних пустых строк) не передаются
+            if docs:
+                _chunk_queue.put(docs)
+        logger.info(f"Прочитан файл: {file_name} - {rows} строк")
+    except Exception as e:
+        logger.error(f"Ошибка чтения файла {csv_file}: {e}")
+    finally:
+        _chunk_queue.put(None)
+
+
+def _scan_csv_files(csv_directory: str) -> Iterator[Tuple[str, str]]:
+    """Обход директории без загрузки списка всех записей: имя и путь непустых CSV файлов
+    (DirEntry кэширует тип файла, без лишних stat)
+    """
+    with os.scandir(csv_directory) as entries:
+        for entry in entries:
+            if entry.name.endswith('.csv') and entry.is_file() and entry.stat().st_size > 0:
+                yield entry.name, entry.path
+
+
+class _ChunkQueueReader:
+    """Чтение частей из общей очереди процессов-воркеров.
+    Ведет счетчик файлов, признак окончания которых еще не получен, без обхода всех задач.
+    """
+    
+    def __init__(self, chunk_queue):
+        self.chunk_queue = chunk_queue
+        self.pending = 0
+        self.errors = []
+    
+    def add(self, future):
+        """Учет задачи чтения файла, переданной в пул"""
+        self.pending += 1
+        future.add_done_callback(self._on_done)
+    
+    def cancel(self, future):
+        """Отмена задачи; отмененная до запуска задача не отправит признак окончания файла"""
+        if future.cancel():
+            self.pending -= 1
+    
+    def _on_done(self, future):
+        # Воркер мог аварийно завершиться (пул сломан), не отправив признак окончания файла
+        if not future.cancelled() and future.exception() is not None:
+            self.errors.append(future.exception())
+    
+    def get(self) -> Optional[List[bytes]]:
+        """Очередная часть из очереди; None - получен признак окончания одного из файлов"""
+        while True:
+            try:
+                item = self.chunk_queue.get(timeout=1)
+            except queue.Empty:
+                if self.errors:
+                    raise self.errors[0]
+                continue
+            if item is None:
+                self.pending -= 1
+            return item
+    
+    def __iter__(self) -> Iterator[List[bytes]]:
+        """Чтение частей, пока все учтенные задачи не сообщат об окончании файла"""
+        while self.pending:
+            item = self.get()
+            if item is not None:
+                yield item
+
+
+def start_log_listener() -> QueueListener:
+    """Перевод логирования на очередь: запись в stderr выполняет отдельный поток,
+    чтобы логирование не блокировало загрузку
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    log_queue = queue.SimpleQueue()
+    logging.getLogger().handlers = [QueueHandler(log_queue)]
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    return listener
+
+
 class CSVToMongoDBLoader:
     def __init__(self, mongo_uri: str, db_name: str, collection_name: str):
         """
@@ -30,11 +353,31 @@ class CSVToMongoDBLoader:
         self.client = None
         self.db = None
         self.collection = None
+        self.import_timestamp = None
         
     def connect_to_mongodb(self) -> bool:
-        """Подключение к MongoDB"""
+        """Подключение к MongoDB с настройками для высокой пропускной способности записи.
+        
+        Запись подтверждается primary без ожидания журнала (w=1, journal=False):
+        при аварийном завершении сервера последние подтвержденные батчи могут быть потеряны,
+        в этом случае загрузку нужно повторить.
+        """
         try:
-            self.client = MongoClient(self.mongo_uri, serverSelectionTimeoutMS=5000)
+            self.client = MongoClient(
+                self.mongo_uri,
+                serverSelectionTimeoutMS=5000,
+                socketTimeoutMS=60000,
+                maxPoolSize=MAX_IN_FLIGHT_BATCHES,
+                minPoolSize=16,
+                # Сжатие трафика: zstd (зависимость pymongo[zstd]), zlib - запасной вариант,
+                # если сервер не поддерживает zstd
+                compressors='zstd,zlib',
+                # Без повторов вставки, чтобы не держать копии батчей для ретрая
+                retryWrites=False,
+                w=1,
+                journal=False,
+                document_class=RawBSONDocument
+            )
             # Проверка подключения
             self.client.admin.command('ping')
             self.db = self.client[self.db_name]
@@ -51,164 +394,215 @@ class CSVToMongoDBLoader:
             self.client.close()
             logger.info("Отключение от MongoDB")
     
-    def read_csv_files(self, csv_directory: str, file_pattern: str = "*.csv") -> List[pd.DataFrame]:
+    def iter_csv_chunks(self, csv_directory: str, chunksize: int = DEFAULT_BATCH_SIZE,
+                        max_workers: Optional[int] = None,
+                        cache_dir: Optional[str] = None) -> Iterator[List[bytes]]:
         """
-        Чтение CSV файлов из директории
+        Потоковое чтение CSV файлов из директории частями, подготовленными для вставки в MongoDB
         
         Args:
             csv_directory: Путь к директории с CSV файлами
-            file_pattern: Паттерн для поиска файлов
+            chunksize: Количество строк в одной части
+            max_workers: Количество процессов для чтения файлов (по умолчанию: число CPU)
+            cache_dir: Директория Parquet кэша подготовленных CSV (None - без кэша)
             
-        Returns:
-            Список DataFrame с данными
+        Yields:
+            Список документов очередной части, закодированных в BSON
         """
-        csv_files = []
-        dataframes = []
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
         
-        try:
-            # Поиск всех CSV файлов в директории
-            for file in os.listdir(csv_directory):
-                if file.endswith('.csv'):
-                    csv_files.append(os.path.join(csv_directory, file))
-            
-            if not csv_files:
-                logger.warning(f"CSV файлы не найдены в директории: {csv_directory}")
-                return dataframes
-            
-            logger.info(f"Найдено {len(csv_files)} CSV файлов")
-            
-            # Чтение каждого CSV файла
-            for csv_file in csv_files:
+        if self.import_timestamp is None:
+            self.import_timestamp = datetime.now(timezone.utc)
+        
+        # Параллельное чтение файлов в процессах-воркерах; части передаются через ограниченную очередь
+        max_workers = max_workers or os.cpu_count() or 1
+        # Воркеры запускаются без fork: к этому моменту в процессе уже работают потоки PyMongo
+        # и логирования, а fork многопоточного процесса небезопасен
+        start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        mp_context = multiprocessing.get_context(start_method)
+        chunk_queue = mp_context.Queue(maxsize=max_workers * 2)
+        executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(chunk_queue,)
+        )
+        chunks = _ChunkQueueReader(chunk_queue)
+        # Файлы передаются в пул по мере обхода директории: в работе не больше max_pending файлов,
+        # следующие берутся из обхода по мере завершения предыдущих
+        max_pending = max_workers * 2
+        files = _scan_csv_files(csv_directory)
+        active = []
+        found = 0
+        scan_failed = False
+        
+        def top_up():
+            nonlocal files, active, found, scan_failed
+            active = [future for future in active if not future.done()]
+            while files is not None and chunks.pending < max_pending:
                 try:
-                    # Чтение CSV с указанием нужных столбцов (без немедленного парсинга дат, чтобы обработать целые числа)
-                    df = pd.read_csv(
-                        csv_file,
-                        usecols=['Open time', 'Open', 'Close', 'High', 'Low', 'Volume']
-                    )
-                    # Добавляем поле с названием файла
-                    df['source_file'] = os.path.basename(csv_file)
-                    df['import_timestamp'] = datetime.now()
-                    dataframes.append(df)
-                    logger.info(f"Прочитан файл: {os.path.basename(csv_file)} - {len(df)} строк")
+                    file_name, csv_file = next(files)
+                except StopIteration:
+                    files = None
+                    break
                 except Exception as e:
-                    logger.error(f"Ошибка чтения файла {csv_file}: {e}")
-                    
-        except Exception as e:
-            logger.error(f"Ошибка при чтении CSV файлов: {e}")
+                    logger.error(f"Ошибка при чтении CSV файлов: {e}")
+                    files = None
+                    scan_failed = True
+                    break
+                future = executor.submit(
+                    _parse_one, file_name, csv_file, chunksize, self.import_timestamp, cache_dir
+                )
+                active.append(future)
+                chunks.add(future)
+                found += 1
         
-        return dataframes
+        try:
+            top_up()
+            if not found:
+                if not scan_failed:
+                    logger.warning(f"CSV файлы не найдены в директории: {csv_directory}")
+                return
+            
+            while chunks.pending:
+                item = chunks.get()
+                if item is None:
+                    # Файл прочитан - передаем в пул следующие
+                    top_up()
+                else:
+                    yield item
+            
+            logger.info(f"Обработано {found} CSV файлов")
+        finally:
+            # При досрочной остановке отменяем неначатые файлы и дочитываем очередь,
+            # чтобы воркеры не зависли на put()
+            if files is not None:
+                files.close()
+            for future in active:
+                chunks.cancel(future)
+            # При сломанном пуле воркеры уже остановлены и дочитывать нечего
+            if not chunks.errors:
+                for _ in chunks:
+                    pass
+            executor.shutdown()
+            if cache_dir is not None:
+                _purge_cache(cache_dir)
     
-    def prepare_data_for_mongodb(self, df: pd.DataFrame) -> List[dict]:
+    @staticmethod
+    def prepare_data_for_mongodb(df: pd.DataFrame, common: Optional[dict] = None) -> Iterator[dict]:
         """
         Подготовка данных для вставки в MongoDB
         
         Args:
             df: DataFrame с данными
+            common: Поля, добавляемые в каждый документ (одни и те же объекты для всех строк)
             
         Returns:
-            Список словарей для вставки в MongoDB
+            Генератор словарей для вставки в MongoDB
         """
-        # Нормализация столбца времени: если целое число (секунды / миллисекунды) -> конвертируем
+        return CSVToMongoDBLoader.iter_documents(CSVToMongoDBLoader.convert_columns(df), common)
+    
+    @staticmethod
+    def convert_columns(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Преобразование столбцов: ISO 8601 строки Open time, float64 числовые поля,
+        пропуск строк без единого значения; некорректные значения становятся NaN
+        
+        Args:
+            df: DataFrame с данными
+            
+        Returns:
+            DataFrame с преобразованными столбцами
+        """
+        # Нормализация столбца времени (векторно): числа (секунды / миллисекунды) конвертируем через helper,
+        # в строковом столбце (файл с ошибками преобразования) остальные значения пытаемся распарсить как даты
         if 'Open time' in df.columns:
-            # Попытка определить типы
-            if pd.api.types.is_integer_dtype(df['Open time']) or pd.api.types.is_float_dtype(df['Open time']):
-                # Целые / числа — преобразуем через helper
-                df['Open time'] = df['Open time'].apply(self._convert_epoch_to_iso)
+            if pd.api.types.is_numeric_dtype(df['Open time']):
+                df['Open time'] = CSVToMongoDBLoader._convert_epoch_to_iso(df['Open time'])
             else:
-                # Пытаемся распарсить строки/даты и привести к ISO
-                def _parse_any(v):
-                    if pd.isna(v):
-                        return None
-                    if isinstance(v, (int, float)):
-                        return self._convert_epoch_to_iso(v)
-                    try:
-                        ts = pd.to_datetime(v, utc=True, errors='raise')
-                        return ts.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+00:00'
-                    except Exception:
-                        return None
-                df['Open time'] = df['Open time'].apply(_parse_any)
-
-        # Преобразование DataFrame в список словарей
-        records = df.to_dict('records')
+                epoch = pd.to_numeric(df['Open time'], errors='coerce')
+                ts = pd.to_datetime(df['Open time'].where(epoch.isna()), utc=True, errors='coerce', format='mixed')
+                df['Open time'] = CSVToMongoDBLoader._convert_epoch_to_iso(epoch).fillna(
+                    CSVToMongoDBLoader._format_iso(ts)
+                )
+
+        # Преобразование числовых полей (векторно, по столбцам)
+        numeric_fields = ['Open', 'High', 'Low', 'Close', 'Volume']
+        for field in numeric_fields:
+            if field in df.columns:
+                df[field] = pd.to_numeric(df[field], errors='coerce').astype('float64')
         
-        # Преобразование типов данных и переименование полей
-        for record in records:
-            # Преобразование числовых полей
-            numeric_fields = ['Open', 'High', 'Low', 'Close', 'Volume']
-            
-            for field in numeric_fields:
-                if field in record and pd.notna(record[field]):
-                    try:
-                        record[field] = float(record[field])
-                    except (ValueError, TypeError):
-                        record[field] = None
-            
-            # Преобразование поля Number of trades в integer, если возможно
-            if 'Number of trades' in record and pd.notna(record['Number of trades']):
-                try:
-                    record['Number of trades'] = int(record['Number of trades'])
-                except (ValueError, TypeError):
-                    record['Number of trades'] = None
+        # Преобразование поля Number of trades в integer, если возможно
+        if 'Number of trades' in df.columns:
+            trades = pd.to_numeric(df['Number of trades'], errors='coerce')
+            df['Number of trades'] = np.trunc(trades).astype('Int64')
+        
+        # Строки без единого значения (например, пустые хвостовые строки файла) пропускаются
+        return df.dropna(how='all')
+    
+    @staticmethod
+    def iter_documents(df: pd.DataFrame, common: Optional[dict] = None) -> Iterator[dict]:
+        """
+        Генерация документов из DataFrame с преобразованными столбцами (NaN -> None)
         
-        return records
+        Args:
+            df: DataFrame после convert_columns
+            common: Поля, добавляемые в каждый документ (одни и те же объекты для всех строк)
+            
+        Returns:
+            Генератор словарей для вставки в MongoDB
+        """
+        # Замена NaN на None одной операцией по маске и построчная генерация документов
+        # copy=True: без копии массив может быть представлением данных DataFrame только для чтения (pandas 3)
+        values = df.to_numpy(dtype=object, copy=True)
+        values[df.isna().to_numpy()] = None
+        keys = tuple(df.columns)
+        common = common or {}
+        return (dict(zip(keys, row), **common) for row in values.tolist())
 
     @staticmethod
-    def _convert_epoch_to_iso(value) -> Optional[str]:
-        """Конвертация числовой метки времени (секунды или миллисекунды) в ISO 8601 строку UTC.
-        Возвращает None при невозможности конвертации.
+    def _convert_epoch_to_iso(values: pd.Series) -> pd.Series:
+        """Конвертация столбца числовых меток времени (секунды или миллисекунды) в ISO 8601 строки UTC.
+        Невозможные для конвертации значения становятся NaN.
         """
-        if pd.isna(value):
-            return None
-        try:
-            # Приводим к int
-            iv = int(value)
-            # Определяем: миллисекунды или секунды
-            # Если значение больше 10**12 (примерно после 2001-09-09 для ms) -> вероятно мс
-            if iv > 10**12:
-                dt = datetime.fromtimestamp(iv / 1000, tz=timezone.utc)
-            elif iv > 10**9:  # секунды ( > ~2001 года )
-                dt = datetime.fromtimestamp(iv, tz=timezone.utc)
-            else:
-                # Возможно в секундах до 2001 года, все равно интерпретируем как секунды
-                dt = datetime.fromtimestamp(iv, tz=timezone.utc)
-            return dt.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + '+00:00'
-        except Exception:
-            return None
+        # Приводим к целым
+        values = np.trunc(pd.to_numeric(values, errors='coerce'))
+        # Определяем: миллисекунды или секунды
+        # Если значение больше 10**12 (примерно после 2001-09-09 для ms) -> вероятно мс,
+        # иначе интерпретируем как секунды (в том числе до 2001 года)
+        ms = values.where(values > 10**12, values * 1000)
+        # Бесконечности и значения вне диапазона дат (например, микросекунды) - NaN,
+        # иначе to_datetime / strftime падают на весь батч
+        ms = ms.where(ms.between(EPOCH_MS_MIN, EPOCH_MS_MAX))
+        ts = pd.to_datetime(ms, unit='ms', utc=True, errors='coerce')
+        return CSVToMongoDBLoader._format_iso(ts)
+    
+    @staticmethod
+    def _format_iso(ts: pd.Series) -> pd.Series:
+        """Форматирование столбца UTC дат в ISO 8601 строки с миллисекундами (NaT -> NaN)"""
+        return ts.dt.strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3] + '+00:00'
     
     def create_indexes(self):
-        """Создание индексов для оптимизации запросов"""
+        """Создание индексов для оптимизации запросов (до загрузки, по известной схеме)"""
         try:
-            # Создание индекса по временным меткам
-            index_info = []
-            
-            if 'Open time' in next(self.collection.find().limit(1), {}):
-                self.collection.create_index([("Open time", 1)])
-                index_info.append("Open time")
-            
-            if 'Close time' in next(self.collection.find().limit(1), {}):
-                self.collection.create_index([("Close time", 1)])
-                index_info.append("Close time")
-            
-            # Индекс по source_file для фильтрации по файлам
-            if 'source_file' in next(self.collection.find().limit(1), {}):
-                self.collection.create_index([("source_file", 1)])
-                index_info.append("source_file")
-            
-            if index_info:
-                logger.info(f"Созданы индексы по полям: {', '.join(index_info)}")
-            else:
-                logger.info("Индексы не созданы (поля не найдены)")
+            # Индекс по временным меткам и по source_file для фильтрации по файлам
+            index_fields = ['Open time', 'source_file']
+            self.collection.create_indexes([IndexModel([(field, 1)]) for field in index_fields])
+            logger.info(f"Созданы индексы по полям: {', '.join(index_fields)}")
             
         except Exception as e:
             logger.warning(f"Ошибка при создании индексов: {e}")
     
-    def load_data_to_mongodb(self, csv_directory: str, batch_size: int = 1000) -> bool:
+    def load_data_to_mongodb(self, csv_directory: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                             cache_dir: Optional[str] = None) -> bool:
         """
         Загрузка данных из CSV файлов в MongoDB
         
         Args:
             csv_directory: Путь к директории с CSV файлами
             batch_size: Размер батча для вставки
+            cache_dir: Директория Parquet кэша подготовленных CSV (None - без кэша)
             
         Returns:
             True если успешно, False если ошибка
@@ -217,41 +611,75 @@ class CSVToMongoDBLoader:
             return False
         
         try:
-            # Чтение CSV файлов
-            dataframes = self.read_csv_files(csv_directory)
-            
-            if not dataframes:
-                logger.error("Нет данных для загрузки")
-                return False
+            # Создание индексов на пустой коллекции, чтобы они заполнялись вместе со вставкой
+            self.create_indexes()
             
+            # Единое время импорта (UTC) для всех документов загрузки
+            self.import_timestamp = datetime.now(timezone.utc)
             total_records = 0
+            batch_number = 0
+            completed_batches = 0
+            last_log = time.monotonic()
+            errors = []
+            lock = threading.Lock()
+            # Ограничение числа батчей в полете, чтобы не накапливать данные в памяти
+            in_flight = threading.BoundedSemaphore(MAX_IN_FLIGHT_BATCHES)
             
-            # Обработка каждого DataFrame
-            for i, df in enumerate(dataframes):
-                logger.info(f"Обработка датафрейма {i+1}/{len(dataframes)}")
-                
-                # Подготовка данных
-                records = self.prepare_data_for_mongodb(df)
-                
-                # Вставка данных батчами
-                for j in range(0, len(records), batch_size):
-                    batch = records[j:j + batch_size]
-                    try:
-                        result = self.collection.insert_many(batch, ordered=False)
-                        total_records += len(result.inserted_ids)
-                        logger.info(f"Вставлено {len(result.inserted_ids)} записей (батч {j//batch_size + 1})")
-                    except BulkWriteError as e:
-                        # Логирование ошибок, но продолжение обработки
-                        error_count = len(e.details['writeErrors'])
-                        logger.warning(f"Ошибки при вставке батча: {error_count} ошибок")
-                        # Подсчет успешных вставок
-                        successful_inserts = len(batch) - error_count
-                        total_records += successful_inserts
+            def on_batch_done(number, future):
+                nonlocal total_records, completed_batches, last_log
+                in_flight.release()
+                try:
+                    inserted = future.result().inserted_count
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug(f"Вставлено {inserted} записей (батч {number})")
+                except BulkWriteError as e:
+                    # Логирование ошибок, но продолжение обработки
+                    error_count = len(e.details['writeErrors'])
+                    logger.warning(f"Ошибки при вставке батча: {error_count} ошибок")
+                    # Подсчет успешных вставок
+                    inserted = e.details['nInserted']
+                except Exception as e:
+                    errors.append(e)
+                    return
+                with lock:
+                    total_records += inserted
+                    completed_batches += 1
+                    # Периодический вывод прогресса вместо строки лога на каждый батч
+                    now = time.monotonic()
+                    if (completed_batches % PROGRESS_LOG_BATCHES == 0
+                            or now - last_log >= PROGRESS_LOG_INTERVAL):
+                        last_log = now
+                        logger.info(f"Вставлено {total_records} записей ({completed_batches} батчей)")
             
-            logger.info(f"Всего загружено записей: {total_records}")
+            # Вставка данных по мере чтения: каждая часть CSV - отдельный батч,
+            # несколько батчей отправляются параллельно
+            with ThreadPoolExecutor(max_workers=INSERT_WORKERS) as executor:
+                for docs in self.iter_csv_chunks(
+                    csv_directory, chunksize=batch_size, cache_dir=cache_dir
+                ):
+                    if errors:
+                        break
+                    batch_number += 1
+                    
+                    # Документы уже закодированы воркерами, PyMongo отправляет их без повторного кодирования
+                    ops = [InsertOne(RawBSONDocument(doc)) for doc in docs]
+                    in_flight.acquire()
+                    future = executor.submit(
+                        self.collection.bulk_write,
+                        ops,
+                        ordered=False,
+                        bypass_document_validation=True
+                    )
+                    future.add_done_callback(functools.partial(on_batch_done, batch_number))
             
-            # Создание индексов после загрузки данных
-            self.create_indexes()
+            if errors:
+                raise errors[0]
+            
+            if batch_number == 0:
+                logger.error("Нет данных для загрузки")
+                return False
+            
+            logger.info(f"Всего загружено записей: {total_records}")
             
             return True
             
@@ -272,28 +700,35 @@ def main():
                        help='Название базы данных (по умолчанию: financial_data)')
     parser.add_argument('--collection', type=str, default='ohlcvt_data',
                        help='Название коллекции (по умолчанию: ohlcvt_data)')
-    parser.add_argument('--batch-size', type=int, default=1000,
-                       help='Размер батча для вставки (по умолчанию: 1000)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                       help=f'Размер батча для вставки (по умолчанию: {DEFAULT_BATCH_SIZE})')
+    parser.add_argument('--cache-dir', type=str, default=None,
+                       help='Директория кэша подготовленных CSV в формате Parquet (по умолчанию: без кэша)')
     
     args = parser.parse_args()
     
-    # Создание загрузчика
-    loader = CSVToMongoDBLoader(
-        mongo_uri=args.mongo_uri,
-        db_name=args.db_name,
-        collection_name=args.collection
-    )
-    
-    # Загрузка данных
-    success = loader.load_data_to_mongodb(
-        csv_directory=args.csv_dir,
-        batch_size=args.batch_size
-    )
-    
-    if success:
-        logger.info("Загрузка данных завершена успешно!")
-    else:
-        logger.error("Загрузка данных завершена с ошибками!")
+    listener = start_log_listener()
+    try:
+        # Создание загрузчика
+        loader = CSVToMongoDBLoader(
+            mongo_uri=args.mongo_uri,
+            db_name=args.db_name,
+            collection_name=args.collection
+        )
+        
+        # Загрузка данных
+        success = loader.load_data_to_mongodb(
+            csv_directory=args.csv_dir,
+            batch_size=args.batch_size,
+            cache_dir=args.cache_dir
+        )
+        
+        if success:
+            logger.info("Загрузка данных завершена успешно!")
+        else:
+            logger.error("Загрузка данных завершена с ошибками!")
+    finally:
+        listener.stop()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
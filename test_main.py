@@ -0,0 +1,90 @@
+import math
+
+import pandas as pd
+
+import main
+from main import CSVToMongoDBLoader
+
+
+def test_convert_epoch_seconds_and_milliseconds():
+    values = pd.Series(['1735689600', '1735689600000', '0'])
+    assert CSVToMongoDBLoader._convert_epoch_to_iso(values).tolist() == [
+        '2025-01-01T00:00:00.000+00:00',
+        '2025-01-01T00:00:00.000+00:00',
+        '1970-01-01T00:00:00.000+00:00',
+    ]
+
+
+def test_convert_epoch_out_of_range_is_nan():
+    # Микросекунды, бесконечности и слишком большие числа не должны ронять весь батч
+    values = pd.Series(['1735689600000000', 'inf', '-inf', '1e300', '12345678901234567890', 'abc'])
+    result = CSVToMongoDBLoader._convert_epoch_to_iso(values).tolist()
+    assert all(isinstance(value, float) and math.isnan(value) for value in result)
+
+
+def test_convert_epoch_keeps_valid_cells_next_to_invalid():
+    values = pd.Series(['1735689600000', '1735689600000000', 'inf'])
+    result = CSVToMongoDBLoader._convert_epoch_to_iso(values)
+    assert result.iloc[0] == '2025-01-01T00:00:00.000+00:00'
+    assert result.iloc[1:].isna().all()
+
+
+def test_prepare_data_replaces_nan_with_none():
+    # Строка без единого значения пропускается
+    df = pd.DataFrame({
+        'Open time': ['1735689600000', '1735689600000000', 'bad'],
+        'Open': ['1.5', '3', 'x'],
+    })
+    docs = list(CSVToMongoDBLoader.prepare_data_for_mongodb(df, {'source_file': 'a.csv'}))
+    assert docs == [
+        {'Open time': '2025-01-01T00:00:00.000+00:00', 'Open': 1.5, 'source_file': 'a.csv'},
+        {'Open time': None, 'Open': 3.0, 'source_file': 'a.csv'},
+    ]
+
+
+def test_read_csv_falls_back_to_strings_on_conversion_error(tmp_path):
+    csv_file = tmp_path / 'a.csv'
+    csv_file.write_text(
+        'Open time,Open,High,Low,Close,Volume\n'
+        '1735689600000,1.5,2,1,1.5,10\n'
+        '1735689660000,x,2,1,1.5,10\n'
+    )
+    table = next(main._rebatch(main._read_csv(str(csv_file)), 10))
+    assert table.schema.field('Open').type == main.pa.string()
+    docs = list(CSVToMongoDBLoader.prepare_data_for_mongodb(table.to_pandas()))
+    assert [doc['Open'] for doc in docs] == [1.5, None]
+    assert docs[1]['Open time'] == '2025-01-01T00:01:00.000+00:00'
+
+
+def test_read_csv_parses_typed_columns(tmp_path):
+    csv_file = tmp_path / 'a.csv'
+    csv_file.write_text('Open time,Open,High,Low,Close,Volume\n1735689600000,1.5,2,1,1.5,10\n')
+    record_batch = next(main._read_csv(str(csv_file)))
+    assert record_batch.schema.field('Open time').type == main.pa.int64()
+    assert record_batch.schema.field('Open').type == main.pa.float64()
+
+
+def test_rebatch_casts_typed_rows_when_file_falls_back_to_strings():
+    typed = main.pa.RecordBatch.from_pydict({'Open': main.pa.array([1.5, 2.0])})
+    strings = main.pa.RecordBatch.from_pydict({'Open': main.pa.array(['x', '3'])})
+    tables = list(main._rebatch(iter([typed, strings]), 3))
+    assert [table.num_rows for table in tables] == [3, 1]
+    assert tables[0].column('Open').to_pylist() == ['1.5', '2', 'x']
+
+
+def test_cache_hit_returns_converted_columns(tmp_path):
+    csv_file = tmp_path / 'a.csv'
+    csv_file.write_text(
+        'Open time,Open,High,Low,Close,Volume\n'
+        '1735689600000,1.5,2,1,1.5,10\n'
+        'inf,x,2,1,1.5,10\n'
+    )
+    cache_dir = tmp_path / 'cache'
+    cache_dir.mkdir()
+    miss = list(main._iter_prepared_chunks(str(csv_file), 10, str(cache_dir)))
+    hit = list(main._iter_prepared_chunks(str(csv_file), 10, str(cache_dir)))
+    assert len(list(cache_dir.iterdir())) == 1
+    docs = [list(CSVToMongoDBLoader.iter_documents(chunks[0])) for chunks in (miss, hit)]
+    assert docs[0] == docs[1]
+    assert docs[1][0]['Open time'] == '2025-01-01T00:00:00.000+00:00'
+    assert docs[1][1]['Open time'] is None and docs[1][1]['Open'] is None